@@ -1,7 +1,9 @@
-import numbers
 import os
 import re
 from argparse import ArgumentParser
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, List, Tuple
 
 from rich import print
@@ -15,6 +17,15 @@ YAML_OBJECT.explicit_start = True
 YAML_OBJECT.indent(sequence=4, offset=2)
 YAML_OBJECT.block_style = True
 RE_MULTILINE_REMARK = re.compile(r"(.*\n\s*#)(.*)")
+_REMARK_FINDALL = RE_MULTILINE_REMARK.findall
+# Comments that normalization would leave unchanged: every line is "# <text>"
+# with no trailing whitespace, and the value ends with a single newline
+RE_NORMALIZED_COMMENT = re.compile(
+    r"[ \t]*# \S(?:[^\n]*\S)?(?:\n[ \t]*# \S(?:[^\n]*\S)?)*\n"
+)
+READ_BUFFER_SIZE = 1 << 16
+# Concrete scalar types avoid the slow ABC check of ``numbers.Number``
+SCALAR_TYPES = (str, int, float)
 
 
 def ensure_spacing_for_multiline_comment(remark):
@@ -35,7 +46,7 @@ def ensure_spacing_for_multiline_comment(remark):
         'comment 11\n# comment 12\n# comment 13'
         >>>
     """
-    remarks = re.findall(RE_MULTILINE_REMARK, remark)
+    remarks = _REMARK_FINDALL(remark)
     # remarks that don't have a subsequent comment are not captured by regex
     if not remarks:
         remarks = (("", remark),)
@@ -100,9 +111,17 @@ def ensure_space_after_octothorpe(comment):
         >>>
     """
     if comment is not None:
+        if RE_NORMALIZED_COMMENT.fullmatch(comment.value):
+            return
         # Comments can start with whitespace,
-        # so partition is used to preserve that in the final result
-        space, octothorpe, remark = comment.value.partition("#")
+        # so the text before "#" is preserved in the final result
+        value = comment.value
+        try:
+            octothorpe = value.index("#")
+        except ValueError:
+            space, remark = value, ""
+        else:
+            space, remark = value[:octothorpe], value[octothorpe + 1 :]  # noqa: E203
         remark_formatted = ensure_spacing_for_multiline_comment(remark)
         comment.value = f"{space}# {remark_formatted.lstrip()}\n"
 
@@ -169,14 +188,15 @@ def ensure_space_comments(comments):
         ])
         >>>
     """
-    comment_objects = (comment for comment_list in comments for comment in comment_list)
-    for comment in comment_objects:
-        # Some comments are nested inside an additional list
-        if not isinstance(comment, list):
-            ensure_space_after_octothorpe(comment)
-        else:
-            for cmt in comment:
-                ensure_space_after_octothorpe(cmt)
+    normalize = ensure_space_after_octothorpe
+    for comment_list in comments:
+        for comment in comment_list:
+            # Some comments are nested inside an additional list
+            if not isinstance(comment, list):
+                normalize(comment)
+            else:
+                for cmt in comment:
+                    normalize(cmt)
 
 
 def update_yaml_comments(yaml_object):
@@ -185,6 +205,8 @@ def update_yaml_comments(yaml_object):
 
     Args:
         yaml_object (ruamel.yaml.comments.CommentedMap | ruamel.yaml.comments.CommentedSeq): The list or dict object.
+            Nested plain ``dict`` and ``list`` objects have no comments,
+            but their entries are still traversed.
 
     Returns:
         None: Comments are updated in place.
@@ -260,19 +282,37 @@ def update_yaml_comments(yaml_object):
 
         >>>
     """
-    comments = yaml_object.ca.items.values()
-    ensure_space_comments(comments)
-    try:
-        yaml_object_values = yaml_object.values()
-    except AttributeError:
-        yaml_object_values = yaml_object
-
-    for entry in yaml_object_values:
-        if isinstance(entry, dict) or isinstance(entry, list):
-            update_yaml_comments(entry)
-
-
-def ensure_yaml_standards(parsed_object, output_path):
+    stack = deque([yaml_object])
+    while stack:
+        node = stack.pop()
+        # Plain dicts and lists, such as values wrapped by ``ensure_yaml_standards``,
+        # carry no comments but may contain nodes that do
+        comment_attrs = getattr(node, "ca", None)
+        if comment_attrs is not None:
+            ensure_space_comments(comment_attrs.items.values())
+        children = node.values() if isinstance(node, dict) else node
+        # Reversed so entries are popped, and updated, in document order
+        stack.extend(
+            entry for entry in reversed(list(children)) if isinstance(entry, (dict, list))
+        )
+
+
+def _dq_value(value):
+    """Wraps a parsed_sample value, or each item of a list value, in double quotes."""
+    # TextFSM capture groups always return strings or lists
+    # This also accounts for numbers incase the YAML was done by hand
+    if isinstance(value, SCALAR_TYPES):
+        return DQ(value)
+    return [DQ(val) for val in value]
+
+
+def _double_quote_entry(entry):
+    """Wraps every value of a parsed_sample entry in double quotes."""
+    for key, value in entry.items():
+        entry[key] = _dq_value(value)
+
+
+def ensure_yaml_standards(parsed_object, output_path, already_quoted=False):
     """
     Ensures YAML files adhere to yamllint config as defined in this project.
 
@@ -280,101 +320,112 @@ def ensure_yaml_standards(parsed_object, output_path):
         parsed_object (dict): The TextFSM/CliTable data converted to a list of dicts.
             The list of dicts must be the value of a dictionary key, ``parsed_sample``.
         output_path (str): The filepath to write the ``parsed_object`` to.
+        already_quoted (bool): Skip wrapping values in double quotes, because
+            they were wrapped when the ``parsed_sample`` entries were built.
 
     Returns:
         None: File I/O is performed to write ``parsed_object`` to ``output_path``.
     """
-    for entry in parsed_object["parsed_sample"]:
+    if not already_quoted:
         # TextFSM conversion will allways be a list of dicts
-        for key, value in entry.items():
-            # TextFSM capture groups always return strings or lists
-            # This also accounts for numbers incase the YAML was done by hand
-            if isinstance(value, (str, numbers.Number)):
-                entry[key] = DQ(value)
-            else:
-                entry[key] = [DQ(val) for val in value]
-    try:
-        update_yaml_comments(parsed_object)
-    except AttributeError:
-        pass
+        for entry in parsed_object["parsed_sample"]:
+            _double_quote_entry(entry)
+    update_yaml_comments(parsed_object)
 
     with open(output_path, "w", encoding="utf-8") as parsed_file:
         YAML_OBJECT.dump(parsed_object, parsed_file)
 
 
-def _textfsm_reslut_to_dict(header: list, reslut: list) -> List[Dict[str, str]]:
-    """将 TextFSM 的结果与header结合转化为dict"""
-    objs = []
-    for row in reslut:
-        temp_dict = {}
-        for index, element in enumerate(row):
-            temp_dict[header[index].lower()] = element
-        objs.append(temp_dict)
+def _textfsm_result_to_dict(
+    header: list, result: list, wrap_dq: bool = False
+) -> List[Dict[str, str]]:
+    """将 TextFSM 的结果与header结合转化为dict, wrap_dq为True时值会被双引号包裹"""
+    lowered_header = [key.lower() for key in header]
+    if not wrap_dq:
+        return [dict(zip(lowered_header, row)) for row in result]
 
-    return objs
+    return [
+        {key: _dq_value(value) for key, value in zip(lowered_header, row)}
+        for row in result
+    ]
 
 
-def get_test_files(vender_os: str, command: str, index: int) -> Tuple[str, str]:
+@lru_cache(maxsize=1024)
+def get_test_files(vendor_os: str, command: str, index: int) -> Tuple[str, str]:
     """获取测试文件路径"""
-    base_name = vendor_os + "_" + command.replace(" ", "_")
+    command_name = command.replace(" ", "_")
+    base_name = f"{vendor_os}_{command_name}"
 
-    raw_base_name = base_name + str(index) if index > 1 else base_name
+    raw_base_name = f"{base_name}{index}" if index > 1 else base_name
 
-    raw_file = os.path.join(
-        "tests", vendor_os, command.replace(" ", "_"), raw_base_name + ".raw"
-    )
+    if os.sep == "/":
+        return (
+            f"tests/{vendor_os}/{command_name}/{raw_base_name}.raw",
+            f"ntc_templates/templates/{base_name}.textfsm",
+        )
+
+    raw_file = os.path.join("tests", vendor_os, command_name, raw_base_name + ".raw")
     template_file = os.path.join("ntc_templates", "templates", base_name + ".textfsm")
     return (raw_file, template_file)
 
 
-def main(vendor_os: str, command: str, index: int) -> List[Dict]:
+@lru_cache(maxsize=1)
+def _load_template(template_file: str, mtime: float) -> TextFSM:
+    """解析textfsm模板, 以文件路径和修改时间作为缓存键"""
+    with open(template_file, buffering=READ_BUFFER_SIZE) as template_fh:
+        return TextFSM(template_fh)
+
+
+def load_template(template_file: str) -> TextFSM:
+    """获取已重置状态的TextFSM模板, 模板文件修改后会重新解析"""
+    template = _load_template(template_file, os.path.getmtime(template_file))
+    template.Reset()
+    return template
+
+
+def main(vendor_os: str, command: str, index: int, wrap_dq: bool = False) -> List[Dict]:
 
     raw_file, template_file = get_test_files(vendor_os, command, index)
 
-    template = TextFSM(open(template_file))
-    stream = open(raw_file, "r").read()
+    template = load_template(template_file)
+    with open(raw_file, "r", buffering=READ_BUFFER_SIZE) as raw_fh:
+        stream = raw_fh.read()
 
     res = template.ParseText(stream)
 
-    output = _textfsm_reslut_to_dict(template.header, res)
+    output = _textfsm_result_to_dict(template.header, res, wrap_dq)
     print(output)
     return output
 
 
 def generate_file(vendor_os: str, command: str, index: int):
-    raw_file, template_file = get_test_files(vendor_os, command, index)
-    if not os.path.exists(raw_file):
+    raw_file, template_file = map(Path, get_test_files(vendor_os, command, index))
+    if not raw_file.exists():
         # 创建raw文件夹
-        if not os.path.exists(os.path.dirname(raw_file)):
-            os.mkdir(os.path.dirname(raw_file))
-        open(raw_file, "w").write("")
+        raw_file.parent.mkdir(parents=True, exist_ok=True)
+        raw_file.touch()
 
-    if not os.path.exists(template_file):
-        open(template_file, "w").write("")
+    if not template_file.exists():
+        template_file.touch()
 
 
 def reg_blank_sub(file: str) -> str:
     """对文件进行空格替换"""
+    final_text = []
+    append = final_text.append
+    # 逐行读取文件, 不再先读入整个文本
     with open(file, "r") as f:
-        text = f.read()
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.startswith("  ^"):
+                append(line)
+                continue
 
-    final_text = []
-    for line in text.splitlines():
-        if not line.startswith("  ^"):
-            final_text.append(line)
-            continue
-
-        line = line[2:]
-        end = ""
-        match_end = re.search(r"( -> .*)$", line)
-        if match_end:
-            end = match_end.group(1)
-            line = line[: -len(end)]
-
-        tmp = " ".join(line.split())
-        tmp = tmp.replace(" ", "\s+")  # noqa: W605
-        tmp = f"  {tmp}{end}"
-        final_text.append(tmp)
+            line, arrow, action = line[2:].partition(" -> ")
+            end = arrow + action
+
+            tmp = r"\s+".join(line.split())
+            append(f"  {tmp}{end}")
 
     with open(file, "w") as f:
         f.write("\n".join(final_text))
@@ -385,8 +436,12 @@ def print_index_file_command(vendor_os: str, command: str, index: int, short: st
 
     res_cmd = []
     cmd_e = command.split()
-    for index, short_cmd_e in enumerate(short.split()):
-        last = cmd_e[index].replace(short_cmd_e, "")
+    short_e = short.split()
+    if len(short_e) > len(cmd_e):
+        raise ValueError(f"{short} has more words than {command}")
+
+    for cmd_part, short_cmd_e in zip(cmd_e, short_e):
+        last = cmd_part.replace(short_cmd_e, "")
         if last == "":
             res_cmd.append(short_cmd_e)
         else:
@@ -451,17 +506,18 @@ if __name__ == "__main__":
         raw_file = get_test_files(vendor_os, command, index)[0]
         raw_file_dir = os.path.dirname(raw_file)
         raw_file_count = 0
-        for file in os.listdir(raw_file_dir):
-            if file.endswith(".yml"):
-                os.remove(os.path.join(raw_file_dir, file))
+        with os.scandir(raw_file_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".yml"):
+                    os.remove(entry.path)
 
-            if file.endswith(".raw"):
-                raw_file_count += 1
+                if entry.name.endswith(".raw"):
+                    raw_file_count += 1
         for index in range(1, raw_file_count + 1):
             raw_file = get_test_files(vendor_os, command, index)[0]
-            ret = main(vendor_os, command, index)
+            ret = main(vendor_os, command, index, wrap_dq=True)
             yml_file = raw_file.replace("raw", "yml")
-            ensure_yaml_standards({"parsed_sample": ret}, yml_file)
+            ensure_yaml_standards({"parsed_sample": ret}, yml_file, already_quoted=True)
             print("generate yml file:", yml_file)
 
         print(f"generate yml {index} file done")
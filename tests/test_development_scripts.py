@@ -3,6 +3,7 @@ from copy import deepcopy
 
 import pytest
 from ruamel.yaml.compat import StringIO
+from ruamel.yaml.scalarstring import DoubleQuotedScalarString
 
 import development_script
 
@@ -68,12 +69,49 @@ def test_ensure_spacing_for_multiline_comment():
     assert remark_formatted == "comment 11\n# comment 12\n# comment 13"
 
 
+def test_ensure_spacing_for_multiline_comment_trailing_octothorpe():
+    remark = " a\n#\n"
+    remark_formatted = development_script.ensure_spacing_for_multiline_comment(remark)
+    assert remark_formatted == " a\n# "
+
+
+def test_ensure_spacing_for_multiline_comment_middle_octothorpe():
+    remark = " a\n#\n# b\n"
+    remark_formatted = development_script.ensure_spacing_for_multiline_comment(remark)
+    assert remark_formatted == " a\n# \n# b"
+
+
 def test_ensure_space_after_octothorpe(copy_yaml_comments):
     comment = copy_yaml_comments.ca.items["b"][2]
     development_script.ensure_space_after_octothorpe(comment)
     assert comment.value == "# comment 2\n# comment 3\n"
 
 
+class ReadOnlyComment:
+    """Comment stub that fails if ``value`` is reassigned."""
+
+    def __init__(self, value):
+        self._value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        raise AssertionError(f"comment value was reassigned to {value!r}")
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["# comment 1\n", "  # comment 2\n  # comment 3\n"],
+)
+def test_ensure_space_after_octothorpe_already_normalized(value):
+    comment = ReadOnlyComment(value)
+    development_script.ensure_space_after_octothorpe(comment)
+    assert comment.value == value
+
+
 def test_ensure_space_comments(copy_yaml_comments):
     comments = copy_yaml_comments.ca.items
     comment_values = comments.values()
@@ -102,3 +140,46 @@ def test_ensure_yaml_standards(teardown_normalize_file, expected_file):
     development_script.ensure_yaml_standards(load_yaml, load_file)
     with open(load_file, encoding="utf-8") as actual:
         assert actual.read() == expected_file
+
+
+def test_ensure_yaml_standards_comments_on_multiple_rows(tmp_path):
+    load_yaml = development_script.YAML_OBJECT.load(
+        '---\nparsed_sample:\n  - a: "1" #row0\n    b: ["x"]\n  - a: "2" #row1\n    b: ["y"]\n'
+    )
+    output_file = tmp_path / "parsed_sample.yml"
+    development_script.ensure_yaml_standards(load_yaml, output_file)
+    actual = output_file.read_text(encoding="utf-8")
+    assert "# row0" in actual
+    assert "# row1" in actual
+
+
+def test_load_template_does_not_leak_results(tmp_path):
+    template_file = tmp_path / "template.textfsm"
+    template_file.write_text(
+        "Value NAME (\\S+)\n\nStart\n  ^name ${NAME} -> Record\n", encoding="utf-8"
+    )
+    first = development_script.load_template(str(template_file))
+    assert first.ParseText("name a\nname b\n") == [["a"], ["b"]]
+    second = development_script.load_template(str(template_file))
+    assert second.ParseText("name c\n") == [["c"]]
+
+
+def test_ensure_yaml_standards_mixed_type_rows(tmp_path):
+    load_yaml = development_script.YAML_OBJECT.load(
+        '---\nparsed_sample:\n  - name: "a"\n    ports: ["1", "2"]\n'
+        '  - name: ["b", "c"]\n    ports: "3"\n'
+    )
+    output_file = tmp_path / "parsed_sample.yml"
+    development_script.ensure_yaml_standards(load_yaml, output_file)
+    second_entry = load_yaml["parsed_sample"][1]
+    assert second_entry["name"] == ["b", "c"]
+    assert second_entry["ports"] == "3"
+
+
+def test_textfsm_result_to_dict_wrap_dq():
+    header = ["VERSION", "SERIAL"]
+    result = [["12.2(54)SG1", ["CAT1451S15C"]]]
+    actual = development_script._textfsm_result_to_dict(header, result, wrap_dq=True)
+    assert actual == [{"version": "12.2(54)SG1", "serial": ["CAT1451S15C"]}]
+    assert isinstance(actual[0]["version"], DoubleQuotedScalarString)
+    assert isinstance(actual[0]["serial"][0], DoubleQuotedScalarString)